@@ -1,17 +1,74 @@
 import requests
-import json
+import orjson
 import os
-import datetime
+import threading
+import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
 from dotenv import load_dotenv
-from collections import Counter
+from matplotlib import font_manager
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from requests.adapters import HTTPAdapter
+from requests_cache import CachedSession
+from urllib3.util.retry import Retry
 from dotenv import load_dotenv
 
 load_dotenv()
 
+# Plots are only saved to disk unless SHOW_PLOTS is set to 1/true/yes; the
+# non-interactive Agg backend renders them without starting a GUI event loop.
+SHOW_PLOTS = os.getenv("SHOW_PLOTS", "").strip().lower() in ("1", "true", "yes")
+if not SHOW_PLOTS:
+    plt.switch_backend("Agg")
+
 BASE_API_URL = "http://api.openweathermap.org/data/2.5/forecast"
 PLOTS_DIR = "visualizations" 
+REQUEST_TIMEOUT = (3.05, 10)  # (connect, read) in seconds
+HTTP_POOL_CONNECTIONS = 8  # distinct hosts kept in the session's pool
+HTTP_POOL_MAXSIZE = 16  # connections kept per host
+# Each fetch worker holds one connection, so never run more than the pool keeps.
+MAX_FETCH_WORKERS = min(8, HTTP_POOL_MAXSIZE)
+CACHE_NAME = ".weather_cache"
+CACHE_EXPIRE_AFTER = 1800  # seconds; the forecast itself only updates every 3 hours
+# Fast zlib level for PNG output: much quicker to encode for a slightly larger file.
+PNG_SAVE_KWARGS = {"compress_level": 1}
+
+# Forecast figure reused across renders; see _get_forecast_figure.
+_FIGURE = None
+_AXES = None
+
+
+def _build_session():
+    """
+    Creates a cached requests Session with a pooled, retrying HTTP adapter.
+    Responses are kept in a local SQLite cache so repeated runs skip the network.
+    The API key is left out of the cache keys and stored responses.
+    """
+    session = CachedSession(
+        CACHE_NAME,
+        backend="sqlite",
+        expire_after=CACHE_EXPIRE_AFTER,
+        stale_if_error=True,
+        ignored_parameters=["appid"],
+    )
+    retries = Retry(total=3, backoff_factor=0.3, status_forcelist=[502, 503, 504])
+    adapter = HTTPAdapter(pool_connections=HTTP_POOL_CONNECTIONS, pool_maxsize=HTTP_POOL_MAXSIZE, max_retries=retries)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    # The API only compresses the (~40 KB) forecast JSON when asked to.
+    session.headers["Accept-Encoding"] = "gzip, deflate"
+    return session
+
+_SESSION = _build_session()
+
+
+def get_session():
+    """
+    Returns the shared HTTP session used for API calls.
+    Reusing one session keeps the connection to the API host alive between requests.
+    """
+    return _SESSION
 
 
 def get_api_key():
@@ -45,9 +102,9 @@ def fetch_weather_data(api_key, city_name):
         "units": "metric"  
     }
     try:
-        response = requests.get(BASE_API_URL, params=params)
+        response = get_session().get(BASE_API_URL, params=params, timeout=REQUEST_TIMEOUT)
         response.raise_for_status() 
-        return response.json()
+        return orjson.loads(response.content)
     except requests.exceptions.HTTPError as http_err:
         if response.status_code == 401:
             print(f"HTTP Error: {http_err} - Invalid API key or key not activated yet.")
@@ -57,7 +114,7 @@ def fetch_weather_data(api_key, city_name):
             print(f"HTTP Error: {http_err}")
     except requests.exceptions.RequestException as req_err:
         print(f"Request Error: {req_err}")
-    except json.JSONDecodeError:
+    except orjson.JSONDecodeError:
         print("Error: Failed to decode JSON response from API.")
     return None
 
@@ -69,155 +126,238 @@ def process_forecast_data(data):
         data (dict): The raw JSON data from the OpenWeatherMap API.
         
     Returns:
-        tuple: A tuple containing lists of timestamps, temperatures, feels_like temperatures,
-               humidities, wind_speeds, and weather_descriptions. Returns None if data is invalid.
+        tuple: A tuple containing NumPy arrays of datetime64 timestamps (in the city's local time),
+               temperatures, feels_like temperatures, humidities and wind_speeds, and a dict
+               counting each weather condition. Returns None if data is invalid.
     """
     if not data or "list" not in data:
         print("Error: Invalid or empty data received from API.")
         return None
 
-    timestamps = []
-    temperatures = []
-    feels_like_temps = []
-    humidities = []
-    wind_speeds = []
-    weather_descriptions_main = [] 
-
-    for entry in data["list"]:
-        dt_object = datetime.datetime.fromtimestamp(entry["dt"])
-        timestamps.append(dt_object)
-        temperatures.append(entry["main"]["temp"])
-        feels_like_temps.append(entry["main"]["feels_like"])
-        humidities.append(entry["main"]["humidity"])
-        wind_speeds.append(entry["wind"]["speed"]) # m/s
+    entries = data["list"]
+    n = len(entries)
+    epoch_seconds = np.empty(n, dtype=np.int64)
+    temperatures = np.empty(n, dtype=np.float32)
+    feels_like_temps = np.empty(n, dtype=np.float32)
+    humidities = np.empty(n, dtype=np.float32)
+    wind_speeds = np.empty(n, dtype=np.float32)
+    condition_counts = defaultdict(int)
+
+    for i, entry in enumerate(entries):
+        readings = entry["main"]
+        epoch_seconds[i] = entry["dt"]
+        temperatures[i] = readings["temp"]
+        feels_like_temps[i] = readings["feels_like"]
+        humidities[i] = readings["humidity"]
+        wind_speeds[i] = entry["wind"]["speed"] # m/s
         if entry["weather"] and len(entry["weather"]) > 0:
-            weather_descriptions_main.append(entry["weather"][0]["main"])
+            condition = entry["weather"][0]["main"]
         else:
-            weather_descriptions_main.append("N/A")
+            condition = "N/A"
+        condition_counts[condition] += 1
+
+    # "dt" is UTC; the city block carries the location's offset from UTC in seconds.
+    utc_offset = data.get("city", {}).get("timezone", 0)
+    timestamps = (epoch_seconds + utc_offset).astype("datetime64[s]")
             
-    return timestamps, temperatures, feels_like_temps, humidities, wind_speeds, weather_descriptions_main
+    return timestamps, temperatures, feels_like_temps, humidities, wind_speeds, dict(condition_counts)
 
-def ensure_plots_dir():
+def compute_daily_stats(timestamps, temps, humidities, wind_speeds):
+    """
+    Computes per-day min/max/mean of temperature, humidity and wind speed.
+    Entries must be in chronological order, as returned by the API.
+
+    Returns:
+        tuple: An array of days and a dict mapping each series name to a
+               (min, max, mean) tuple of arrays with one value per day.
+    """
+    days = np.asarray(timestamps, dtype="datetime64[D]")
+    unique_days, starts, counts = np.unique(days, return_index=True, return_counts=True)
+    # One reduction per statistic over all three series at once.
+    series = np.stack((temps, humidities, wind_speeds))
+    mins = np.minimum.reduceat(series, starts, axis=1)
+    maxs = np.maximum.reduceat(series, starts, axis=1)
+    means = np.add.reduceat(series, starts, axis=1) / counts
+    names = ("temperature", "humidity", "wind_speed")
+    stats = {name: (mins[i], maxs[i], means[i]) for i, name in enumerate(names)}
+    return unique_days, stats
+
+def print_daily_summary(daily_stats, city_name):
+    """Prints a per-day summary table of the forecast."""
+    days, stats = daily_stats
+    temp_min, temp_max, temp_mean = stats["temperature"]
+    humidity_mean = stats["humidity"][2]
+    wind_max = stats["wind_speed"][1]
+    print(f"\nDaily summary for {city_name.title()}:")
+    print(f"{'Date':<12}{'Min °C':>8}{'Max °C':>8}{'Avg °C':>8}{'Avg RH %':>10}{'Max wind m/s':>14}")
+    for i, day in enumerate(days):
+        print(f"{str(day):<12}{temp_min[i]:>8.1f}{temp_max[i]:>8.1f}{temp_mean[i]:>8.1f}"
+              f"{humidity_mean[i]:>10.0f}{wind_max[i]:>14.1f}")
+
+def parse_city_names(raw_city_names):
+    """
+    Splits a semicolon-separated CITY_NAME value into a list of city names.
+    Semicolons are used because commas belong to the API's "city,country" form.
+    """
+    if not raw_city_names:
+        return []
+    return [city.strip() for city in raw_city_names.split(";") if city.strip()]
+
+def city_plots_dir(city_name):
+    """Returns the per-city subdirectory of PLOTS_DIR, e.g. "London,GB" -> visualizations/london_gb."""
+    return os.path.join(PLOTS_DIR, "_".join(city_name.lower().replace(",", " ").split()))
+
+def ensure_plots_dir(plots_dir=PLOTS_DIR):
     """Ensures the directory for saving plots exists."""
-    if not os.path.exists(PLOTS_DIR):
-        os.makedirs(PLOTS_DIR)
-        print(f"Created directory: {PLOTS_DIR}")
-
-
-def plot_temperature_forecast(timestamps, temps, feels_like_temps, city_name):
-    """Generates and saves a plot for temperature and feels_like temperature."""
-    plt.figure(figsize=(12, 6))
-    sns.lineplot(x=timestamps, y=temps, marker='o', label="Temperature (°C)")
-    sns.lineplot(x=timestamps, y=feels_like_temps, marker='x', linestyle='--', label="Feels Like (°C)")
-    plt.title(f"5-Day Temperature & Feels Like Forecast for {city_name.title()}")
-    plt.xlabel("Time")
-    plt.ylabel("Temperature (°C)")
-    plt.xticks(rotation=45)
-    plt.legend()
-    plt.grid(True)
-    plt.tight_layout()
-    
-    filename = os.path.join(PLOTS_DIR, "temperature_forecast.png")
-    plt.savefig(filename)
-    print(f"Saved temperature forecast plot to {filename}")
-    plt.show()
-
-def plot_humidity_forecast(timestamps, humidities, city_name):
-    """Generates and saves a plot for humidity."""
-    plt.figure(figsize=(12, 6))
-    sns.lineplot(x=timestamps, y=humidities, marker='o', color='teal', label="Humidity (%)")
-    plt.title(f"5-Day Humidity Forecast for {city_name.title()}")
-    plt.xlabel("Time")
-    plt.ylabel("Humidity (%)")
-    plt.xticks(rotation=45)
-    plt.ylim(0, 100) 
-    plt.legend()
-    plt.grid(True)
-    plt.tight_layout()
-
-    filename = os.path.join(PLOTS_DIR, "humidity_forecast.png")
-    plt.savefig(filename)
-    print(f"Saved humidity forecast plot to {filename}")
-    plt.show()
-
-def plot_wind_speed_forecast(timestamps, wind_speeds, city_name):
-    """Generates and saves a plot for wind speed."""
-    plt.figure(figsize=(12, 6))
-    sns.lineplot(x=timestamps, y=wind_speeds, marker='o', color='purple', label="Wind Speed (m/s)")
-    plt.title(f"5-Day Wind Speed Forecast for {city_name.title()}")
-    plt.xlabel("Time")
-    plt.ylabel("Wind Speed (m/s)")
-    plt.xticks(rotation=45)
-    plt.legend()
-    plt.grid(True)
-    plt.tight_layout()
-
-    filename = os.path.join(PLOTS_DIR, "wind_speed_forecast.png")
-    plt.savefig(filename)
-    print(f"Saved wind speed forecast plot to {filename}")
-    plt.show()
-
-def plot_weather_conditions_pie(weather_descriptions_main, city_name):
-    """Generates and saves a pie chart for weather condition distribution."""
-    if not weather_descriptions_main:
+    os.makedirs(plots_dir, exist_ok=True)
+
+
+def _draw_temperature(ax, timestamps, temps, feels_like_temps):
+    """Draws temperature and feels_like temperature onto the given Axes."""
+    ax.plot(timestamps, temps, marker='o', label="Temperature (°C)")
+    ax.plot(timestamps, feels_like_temps, marker='x', linestyle='--', label="Feels Like (°C)")
+    ax.set_title("Temperature & Feels Like")
+    ax.set_xlabel("Time")
+    ax.set_ylabel("Temperature (°C)")
+    ax.tick_params(axis='x', labelrotation=45)
+    ax.legend()
+    ax.grid(True)
+
+def _draw_humidity(ax, timestamps, humidities):
+    """Draws humidity onto the given Axes."""
+    ax.plot(timestamps, humidities, marker='o', color='teal', label="Humidity (%)")
+    ax.set_title("Humidity")
+    ax.set_xlabel("Time")
+    ax.set_ylabel("Humidity (%)")
+    ax.tick_params(axis='x', labelrotation=45)
+    ax.set_ylim(0, 100) 
+    ax.legend()
+    ax.grid(True)
+
+def _draw_wind_speed(ax, timestamps, wind_speeds):
+    """Draws wind speed onto the given Axes."""
+    ax.plot(timestamps, wind_speeds, marker='o', color='purple', label="Wind Speed (m/s)")
+    ax.set_title("Wind Speed")
+    ax.set_xlabel("Time")
+    ax.set_ylabel("Wind Speed (m/s)")
+    ax.tick_params(axis='x', labelrotation=45)
+    ax.legend()
+    ax.grid(True)
+
+def _draw_weather_conditions_pie(ax, condition_counts):
+    """Draws a pie chart of the weather condition distribution onto the given Axes."""
+    ax.set_title("Distribution of Weather Conditions")
+    if not condition_counts:
         print("No weather descriptions to plot for pie chart.")
+        ax.axis('off')
         return
 
-    condition_counts = Counter(weather_descriptions_main)
-    labels = condition_counts.keys()
-    sizes = condition_counts.values()
+    labels = list(condition_counts.keys())
+    sizes = list(condition_counts.values())
     
     colors = sns.color_palette('pastel')[0:len(labels)]
 
-    plt.figure(figsize=(10, 8))
-    plt.pie(sizes, labels=labels, colors=colors, autopct='%1.1f%%', startangle=140, shadow=True)
-    plt.title(f"Distribution of Weather Conditions for {city_name.title()} (Next 5 Days)")
-    plt.axis('equal')  
-    plt.tight_layout()
+    ax.pie(sizes, labels=labels, colors=colors, autopct='%1.1f%%', startangle=140, shadow=True)
+    ax.axis('equal')  
+
+def _warm_font_cache():
+    """Resolves the default font so the first savefig does not pay for the font lookup."""
+    font_manager.findfont(font_manager.FontProperties())
+
+def _get_forecast_figure():
+    """
+    Returns the shared 2x2 forecast figure and its axes, cleared for a new render.
+    The figure is created on first use, or again if its window has been closed.
+    """
+    global _FIGURE, _AXES
+    if _FIGURE is None or not plt.fignum_exists(_FIGURE.number):
+        _FIGURE, axes = plt.subplots(2, 2, figsize=(16, 10))
+        _AXES = tuple(axes.flat)
+        temp_ax, humidity_ax, wind_ax, _ = _AXES
+        humidity_ax.sharex(temp_ax)
+        wind_ax.sharex(temp_ax)
+    else:
+        for ax in _AXES:
+            ax.clear()
+    return _FIGURE, _AXES
+
+def plot_all(processed_data, city_name, plots_dir=PLOTS_DIR):
+    """
+    Generates and saves a single 2x2 figure with the temperature, humidity and
+    wind speed forecasts and the weather condition distribution.
+    """
+    timestamps, temps, feels_like_temps, humidities, wind_speeds, condition_counts = processed_data
+
+    fig, (temp_ax, humidity_ax, wind_ax, pie_ax) = _get_forecast_figure()
+
+    _draw_temperature(temp_ax, timestamps, temps, feels_like_temps)
+    _draw_humidity(humidity_ax, timestamps, humidities)
+    _draw_wind_speed(wind_ax, timestamps, wind_speeds)
+    _draw_weather_conditions_pie(pie_ax, condition_counts)
+
+    fig.suptitle(f"5-Day Weather Forecast for {city_name.title()}")
+    fig.tight_layout()
 
-    filename = os.path.join(PLOTS_DIR, "weather_conditions_pie_chart.png")
-    plt.savefig(filename)
-    print(f"Saved weather conditions pie chart to {filename}")
-    plt.show()
+    filename = os.path.join(plots_dir, "forecast.png")
+    fig.savefig(filename, dpi=100, pil_kwargs=PNG_SAVE_KWARGS)
+    print(f"Saved forecast plots to {filename}")
+    if SHOW_PLOTS:
+        plt.show()
+
+def visualize_city(city_name, weather_data, plots_dir=PLOTS_DIR):
+    """Processes the forecast for one city and saves its plots. Returns True on success."""
+    processed_data = process_forecast_data(weather_data)
+    if not processed_data:
+        print(f"Failed to process weather data for {city_name.title()}.")
+        return False
+
+    timestamps, temps, _, humidities, wind_speeds, _ = processed_data
+
+    print_daily_summary(compute_daily_stats(timestamps, temps, humidities, wind_speeds), city_name)
+
+    ensure_plots_dir(plots_dir)
+
+    print(f"\nGenerating and saving plots for {city_name.title()}...")
+    plot_all(processed_data, city_name, plots_dir)
+    return True
 
 def main():
     """Main function to run the weather data fetching and visualization."""
     print("--- Weather Data Visualizer ---")
     
     sns.set_theme(style="whitegrid")
+    # Font lookup runs in the background while the forecasts are being fetched.
+    threading.Thread(target=_warm_font_cache, daemon=True).start()
 
     api_key = get_api_key()
     
-    city_name = os.getenv("CITY_NAME")
-    if not city_name:
+    city_names = parse_city_names(os.getenv("CITY_NAME"))
+    if not city_names:
         print("City name cannot be empty. Exiting.")
         return
 
-    print(f"\nFetching weather data for {city_name.title()}...")
-    weather_data = fetch_weather_data(api_key, city_name)
+    print(f"\nFetching weather data for {', '.join(city.title() for city in city_names)}...")
 
-    if weather_data:
-        print("Weather data fetched successfully.")
-        
-        processed_data = process_forecast_data(weather_data)
-        if not processed_data:
-            print("Failed to process weather data. Exiting.")
-            return
-            
-        timestamps, temps, feels_like_temps, humidities, wind_speeds, weather_descriptions = processed_data
-        
-        ensure_plots_dir()
-        
-        print("\nGenerating and saving plots...")
-        plot_temperature_forecast(timestamps, temps, feels_like_temps, city_name)
-        plot_humidity_forecast(timestamps, humidities, city_name)
-        plot_wind_speed_forecast(timestamps, wind_speeds, city_name)
-        plot_weather_conditions_pie(weather_descriptions, city_name)
-        
+    # Fetches overlap on the network; processing and plotting stay on the main
+    # thread because matplotlib is not thread-safe.
+    saved_any = False
+    with ThreadPoolExecutor(max_workers=min(len(city_names), MAX_FETCH_WORKERS)) as executor:
+        futures = {executor.submit(fetch_weather_data, api_key, city): city for city in city_names}
+        for future in as_completed(futures):
+            city_name = futures[future]
+            weather_data = future.result()
+            if not weather_data:
+                print(f"Could not retrieve weather data for {city_name.title()}. Please check the city name and your API key.")
+                continue
+
+            print(f"Weather data for {city_name.title()} fetched successfully.")
+            # A single city keeps the flat layout; several cities get one subdirectory each.
+            plots_dir = PLOTS_DIR if len(city_names) == 1 else city_plots_dir(city_name)
+            saved_any = visualize_city(city_name, weather_data, plots_dir) or saved_any
+
+    if saved_any:
         print(f"\n--- All visualizations saved in '{PLOTS_DIR}' directory ---")
         print("--- Script finished ---")
-    else:
-        print(f"Could not retrieve weather data for {city_name.title()}. Please check the city name and your API key.")
 
 if __name__ == "__main__":
     main()